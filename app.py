@@ -1,10 +1,13 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
-from flask_mail import Mail, Message
+from flask import Flask, render_template, request, redirect, url_for, flash, session, g, abort
+from flask_mail import Mail
 from functools import wraps
 from config import Config
 from models import ContactMessage, Database, Skill, Certificate, Project
+from notifications import ContactNotifier
+from tenants import current_tenant, reset_current_tenant, resolve_tenant, set_current_tenant
+import atexit
+import os
 import re
-from datetime import datetime
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -12,10 +15,75 @@ app.config.from_object(Config)
 # Initialize Flask-Mail
 mail = Mail(app)
 
+# Contact notifications (immediate or digest, see Config.MAIL_DIGEST_MODE)
+notifier = ContactNotifier(app, mail)
+
+# Background archiving of old read messages (see Config.CONTACT_RETENTION_DAYS)
+if Config.CONTACT_RETENTION_DAYS > 0:
+    ContactMessage.get_archiver().start()
+
 # Email validation regex
 EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 
 
+# ---------------------------------------------------------------------------
+# Build-time assets (see build_assets.py)
+# ---------------------------------------------------------------------------
+
+def load_critical_css():
+    """Read the per-page critical CSS written by build_assets.py"""
+    critical_dir = os.path.join(app.static_folder, 'css', 'critical')
+    critical = {}
+    if os.path.isdir(critical_dir):
+        for filename in os.listdir(critical_dir):
+            if filename.endswith('.css'):
+                with open(os.path.join(critical_dir, filename), encoding='utf-8') as f:
+                    critical[filename[:-4]] = f.read()
+    return critical
+
+
+def load_icon_subset():
+    """Icons covered by the self-hosted icon font subset, if it was built"""
+    path = os.path.join(app.static_folder, 'css', 'icons.css')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return set(re.findall(r'\.(fa-[a-z0-9-]+)::before', f.read()))
+
+
+CRITICAL_CSS = load_critical_css()
+ICON_SUBSET = load_icon_subset()
+
+
+@app.context_processor
+def inject_assets():
+    """Expose the current page's critical CSS and the icon subset to templates"""
+    return {
+        'critical_css': CRITICAL_CSS.get(request.endpoint),
+        'icon_subset': ICON_SUBSET
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tenant resolution
+# ---------------------------------------------------------------------------
+
+@app.before_request
+def set_request_tenant():
+    """Pick the tenant (site) for this request from the Host header"""
+    tenant = resolve_tenant(request.host)
+    if tenant is None:
+        abort(404)
+    g.tenant_token = set_current_tenant(tenant)
+
+
+@app.teardown_request
+def reset_request_tenant(exception=None):
+    token = g.pop('tenant_token', None)
+    if token is not None:
+        reset_current_tenant(token)
+
+
 # ---------------------------------------------------------------------------
 # Admin auth helper
 # ---------------------------------------------------------------------------
@@ -24,7 +92,7 @@ def admin_required(f):
     """Decorator: redirect to admin login if not authenticated."""
     @wraps(f)
     def decorated(*args, **kwargs):
-        if not session.get('admin_logged_in'):
+        if session.get('admin_logged_in') != current_tenant().name:
             flash('Please log in to access the admin panel.', 'error')
             return redirect(url_for('admin_login'))
         return f(*args, **kwargs)
@@ -38,70 +106,10 @@ def admin_required(f):
 def send_contact_email(name, email, message):
     """
     Send email notification when contact form is submitted.
-    Returns True if sent successfully, False otherwise.
+    In digest mode the message is queued and mailed with the next digest.
+    Returns True if sent (or queued) successfully, False otherwise.
     """
-    try:
-        msg = Message(
-            subject=f'New Contact Form Submission from {name}',
-            sender=app.config['MAIL_DEFAULT_SENDER'],
-            recipients=[app.config['RECIPIENT_EMAIL']],
-            reply_to=email
-        )
-        msg.body = f"""
-You have received a new message from your portfolio contact form.
-
-From: {name}
-Email: {email}
-Submitted: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-Message:
-{message}
-
----
-You can reply directly to this email to respond to {name}.
-        """
-        msg.html = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f4f4f4;">
-                    <div style="background-color: #0a1128; color: #d4af37; padding: 20px; text-align: center;">
-                        <h2 style="margin: 0;">New Contact Form Submission</h2>
-                    </div>
-                    <div style="background-color: white; padding: 30px; margin-top: 20px; border-radius: 5px;">
-                        <p style="font-size: 16px; margin-bottom: 20px;">
-                            You have received a new message from your portfolio website.
-                        </p>
-                        <table style="width: 100%; border-collapse: collapse;">
-                            <tr>
-                                <td style="padding: 10px; background-color: #f8f9fa; font-weight: bold; width: 100px;">From:</td>
-                                <td style="padding: 10px;">{name}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 10px; background-color: #f8f9fa; font-weight: bold;">Email:</td>
-                                <td style="padding: 10px;"><a href="mailto:{email}" style="color: #d4af37;">{email}</a></td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 10px; background-color: #f8f9fa; font-weight: bold;">Date:</td>
-                                <td style="padding: 10px;">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</td>
-                            </tr>
-                        </table>
-                        <div style="margin-top: 30px; padding: 20px; background-color: #f8f9fa; border-left: 4px solid #d4af37;">
-                            <h3 style="margin-top: 0; color: #0a1128;">Message:</h3>
-                            <p style="white-space: pre-wrap;">{message}</p>
-                        </div>
-                        <p style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; color: #666; font-size: 14px;">
-                            You can reply directly to this email to respond to {name}.
-                        </p>
-                    </div>
-                </div>
-            </body>
-        </html>
-        """
-        mail.send(msg)
-        return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        return False
+    return notifier.notify(name, email, message)
 
 
 # ---------------------------------------------------------------------------
@@ -204,13 +212,15 @@ def contact():
 @app.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     """Admin login page"""
-    if session.get('admin_logged_in'):
+    tenant = current_tenant()
+    if session.get('admin_logged_in') == tenant.name:
         return redirect(url_for('admin_dashboard'))
 
     if request.method == 'POST':
         password = request.form.get('password', '')
-        if password == app.config['ADMIN_PASSWORD']:
-            session['admin_logged_in'] = True
+        if password == tenant.get('ADMIN_PASSWORD'):
+            # Store the tenant name so a session is only valid for its own site
+            session['admin_logged_in'] = tenant.name
             flash('Welcome back, Hirthick!', 'success')
             return redirect(url_for('admin_dashboard'))
         else:
@@ -251,15 +261,36 @@ def admin_dashboard():
     except Exception:
         projects_list = []
 
+    archive_query = request.args.get('archive_q', '').strip()
+    archived_messages = []
+    if archive_query:
+        try:
+            archived_messages = ContactMessage.search_archive(archive_query)
+        except Exception as e:
+            flash(f'Error searching archived messages: {e}', 'error')
+
     return render_template(
         'admin_dashboard.html',
         skills=skills_list,
         certificates=certs_list,
         messages=messages_list,
-        projects=projects_list
+        projects=projects_list,
+        archive_query=archive_query,
+        archived_messages=archived_messages
     )
 
 
+@app.route('/admin/messages/read/<message_id>', methods=['POST'])
+@admin_required
+def admin_mark_message_read(message_id):
+    """Mark a contact message as read"""
+    try:
+        ContactMessage.mark_as_read(message_id)
+    except Exception as e:
+        flash(f'Error updating message: {e}', 'error')
+    return redirect(url_for('admin_dashboard') + '#messages')
+
+
 @app.route('/admin/skills/add', methods=['POST'])
 @admin_required
 def admin_add_skill():
@@ -483,10 +514,9 @@ def admin_edit_project(project_id):
 # Teardown
 # ---------------------------------------------------------------------------
 
-@app.teardown_appcontext
-def shutdown_session(exception=None):
-    """Close database connection when app context ends"""
-    Database.close()
+# The MongoClient pool is shared by every request and tenant, so it is only
+# closed when the process exits
+atexit.register(Database.close)
 
 
 if __name__ == '__main__':
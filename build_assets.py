@@ -0,0 +1,309 @@
+"""
+Build-time asset step.
+
+Extracts the above-the-fold CSS for each public page into
+static/css/critical/<page>.css so base.html can inline it and load the full
+stylesheets asynchronously.
+
+With --fontawesome-dir pointing at an unpacked Font Awesome 6.4.0 release
+(and fontTools + brotli installed) it also writes a self-hosted subset of
+the icon fonts to static/fonts/ and the matching static/css/icons.css,
+covering only the icons the templates use.
+
+Usage:
+    python build_assets.py [--fontawesome-dir PATH]
+"""
+import argparse
+import os
+import re
+from html.parser import HTMLParser
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSS_DIR = os.path.join(BASE_DIR, 'static', 'css')
+CRITICAL_DIR = os.path.join(CSS_DIR, 'critical')
+FONTS_DIR = os.path.join(BASE_DIR, 'static', 'fonts')
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+MAIN_JS = os.path.join(BASE_DIR, 'static', 'js', 'main.js')
+
+# Public pages get critical CSS; the endpoint name matches the template name
+PAGES = ['index', 'about', 'projects', 'skills', 'certificates', 'contact']
+
+# Stylesheets in the order and media base.html loads them
+STYLESHEETS = [
+    ('style.css', '(min-width: 769px)'),
+    ('mobile.css', '(max-width: 768px)'),
+]
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+             'link', 'meta', 'source', 'track', 'wbr'}
+
+# Font Awesome style classes; everything else starting with fa- is an icon
+FA_STYLE_CLASSES = {'fa', 'fas', 'fab', 'far', 'fa-solid', 'fa-brands', 'fa-regular'}
+
+
+# ---------------------------------------------------------------------------
+# Above-the-fold element collection
+# ---------------------------------------------------------------------------
+
+class AboveFoldParser(HTMLParser):
+    """
+    Collects tag names, classes and ids of the elements rendered before the
+    end of the first <section> inside <main> (navigation, loader, hero).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tags = set()
+        self.classes = set()
+        self.ids = set()
+        self.done = False
+        self.in_main = False
+        self.section_depth = 0
+
+    def _collect(self, tag, attrs):
+        self.tags.add(tag)
+        for name, value in attrs:
+            if name == 'class' and value:
+                self.classes.update(value.split())
+            elif name == 'id' and value:
+                self.ids.add(value)
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        self._collect(tag, attrs)
+        if tag == 'main':
+            self.in_main = True
+        elif self.in_main and tag not in VOID_TAGS and (self.section_depth or tag == 'section'):
+            self.section_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.done:
+            self._collect(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self.done or not self.section_depth or tag in VOID_TAGS:
+            return
+        self.section_depth -= 1
+        if self.section_depth == 0:
+            self.done = True
+
+
+def script_classes():
+    """Classes main.js adds at runtime (dark mode, loader, scrolled navbar...)"""
+    with open(MAIN_JS, encoding='utf-8') as f:
+        return set(re.findall(r"classList\.(?:add|toggle)\('([\w-]+)'\)", f.read()))
+
+
+def render_page(app, page):
+    """Render a page template without touching the database"""
+    from flask import render_template, url_for
+    with app.test_request_context():
+        path = url_for(page)
+    with app.test_request_context(path):
+        return render_template(f'{page}.html')
+
+
+# ---------------------------------------------------------------------------
+# Minimal CSS parsing and filtering
+# ---------------------------------------------------------------------------
+
+def parse_css(text):
+    """
+    Split a stylesheet into a list of (prelude, body) pairs. The body of
+    @media and @supports blocks is itself a parsed list.
+    """
+    rules = []
+    i = 0
+    while i < len(text):
+        start = text.find('{', i)
+        semi = text.find(';', i)
+        if start == -1:
+            break
+        if semi != -1 and semi < start and text[i:semi].strip().startswith('@'):
+            # Block-less at-rule such as @import or @charset
+            rules.append((text[i:semi].strip(), None))
+            i = semi + 1
+            continue
+        prelude = text[i:start].strip()
+        depth = 1
+        j = start + 1
+        while depth and j < len(text):
+            if text[j] == '{':
+                depth += 1
+            elif text[j] == '}':
+                depth -= 1
+            j += 1
+        body = text[start + 1:j - 1]
+        if prelude.startswith(('@media', '@supports')):
+            body = parse_css(body)
+        rules.append((prelude, body.strip() if isinstance(body, str) else body))
+        i = j
+    return rules
+
+
+def selector_matches(selector, tags, classes, ids):
+    """True if every tag, class and id in the selector is on the page"""
+    simplified = re.sub(r'\[[^\]]*\]', '', selector)
+    simplified = re.sub(r'::?[\w-]+(\([^)]*\))?', '', simplified)
+    if not set(re.findall(r'\.([\w-]+)', simplified)) <= classes:
+        return False
+    if not set(re.findall(r'#([\w-]+)', simplified)) <= ids:
+        return False
+    found_tags = re.findall(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)', simplified)
+    return all(tag.lower() in tags for tag in found_tags)
+
+
+def filter_rules(rules, tags, classes, ids):
+    """Keep the rules (and the parts of selector lists) used on the page"""
+    kept = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            inner = filter_rules(body, tags, classes, ids)
+            if inner:
+                kept.append((prelude, inner))
+        elif prelude.startswith('@'):
+            kept.append((prelude, body))
+        else:
+            selectors = [s.strip() for s in prelude.split(',')]
+            matching = [s for s in selectors if selector_matches(s, tags, classes, ids)]
+            if matching:
+                kept.append((', '.join(matching), body))
+    return kept
+
+
+def drop_unused_keyframes(rules):
+    """Remove @keyframes no kept declaration refers to"""
+    declarations = serialize(
+        [(p, b) for p, b in rules if not p.startswith('@keyframes')]
+    )
+    kept = []
+    for prelude, body in rules:
+        if prelude.startswith('@keyframes'):
+            name = prelude.split(None, 1)[1].strip()
+            if not re.search(r'\b%s\b' % re.escape(name), declarations):
+                continue
+        kept.append((prelude, body))
+    return kept
+
+
+def minify(body):
+    body = re.sub(r'\s+', ' ', body).strip()
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', body).rstrip(';')
+
+
+def serialize(rules):
+    out = []
+    for prelude, body in rules:
+        if body is None:
+            out.append(prelude + ';')
+        elif isinstance(body, list):
+            out.append(f'{prelude}{{{serialize(body)}}}')
+        elif prelude.startswith('@keyframes'):
+            inner = ''.join(
+                f'{minify(p)}{{{minify(b)}}}' for p, b in parse_css(body)
+            )
+            out.append(f'{prelude}{{{inner}}}')
+        else:
+            out.append(f'{minify(prelude)}{{{minify(body)}}}')
+    return ''.join(out)
+
+
+def read_css(path):
+    with open(path, encoding='utf-8') as f:
+        return re.sub(r'/\*.*?\*/', '', f.read(), flags=re.S)
+
+
+# ---------------------------------------------------------------------------
+# Build steps
+# ---------------------------------------------------------------------------
+
+def build_critical_css():
+    """Write static/css/critical/<page>.css for every public page"""
+    from app import app
+
+    runtime_classes = script_classes()
+    stylesheets = [
+        (parse_css(read_css(os.path.join(CSS_DIR, name))), media)
+        for name, media in STYLESHEETS
+    ]
+    os.makedirs(CRITICAL_DIR, exist_ok=True)
+
+    for page in PAGES:
+        parser = AboveFoldParser()
+        parser.feed(render_page(app, page))
+        classes = parser.classes | runtime_classes
+        parts = []
+        for rules, media in stylesheets:
+            kept = drop_unused_keyframes(filter_rules(rules, parser.tags, classes, parser.ids))
+            if kept:
+                parts.append(f'@media {media}{{{serialize(kept)}}}')
+        path = os.path.join(CRITICAL_DIR, f'{page}.css')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(parts) + '\n')
+        print(f"✓ {os.path.relpath(path, BASE_DIR)} ({os.path.getsize(path)} bytes)")
+
+
+def used_icons():
+    """Icon classes (fa-*) used anywhere in the templates"""
+    icons = set()
+    for root, _dirs, files in os.walk(TEMPLATES_DIR):
+        for name in files:
+            with open(os.path.join(root, name), encoding='utf-8') as f:
+                icons.update(re.findall(r'\b(fa-[a-z0-9-]+)\b', f.read()))
+    return icons - FA_STYLE_CLASSES
+
+
+def build_icon_subset(fontawesome_dir):
+    """Write subset icon fonts to static/fonts/ and static/css/icons.css"""
+    from fontTools import subset
+
+    icons = used_icons()
+    rules = parse_css(read_css(os.path.join(fontawesome_dir, 'css', 'all.css')))
+    rules = [(p, b) for p, b in rules if not p.startswith('@font-face')]
+    kept = drop_unused_keyframes(filter_rules(rules, set(), icons | FA_STYLE_CLASSES, set()))
+
+    codepoints = set()
+    for prelude, body in kept:
+        if isinstance(body, str) and '::before' in prelude:
+            match = re.search(r'content:\s*"\\([0-9a-f]+)"', body)
+            if match:
+                codepoints.add(int(match.group(1), 16))
+
+    os.makedirs(FONTS_DIR, exist_ok=True)
+    faces = []
+    for filename, family, weight in [
+        ('fa-solid-900', 'Font Awesome 6 Free', 900),
+        ('fa-brands-400', 'Font Awesome 6 Brands', 400),
+    ]:
+        options = subset.Options()
+        options.flavor = 'woff2'
+        options.layout_features = ['*']
+        font = subset.load_font(
+            os.path.join(fontawesome_dir, 'webfonts', f'{filename}.ttf'), options
+        )
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        subset.save_font(font, os.path.join(FONTS_DIR, f'{filename}.woff2'), options)
+        faces.append(
+            f'@font-face{{font-family:"{family}";font-style:normal;'
+            f'font-weight:{weight};font-display:block;'
+            f'src:url("../fonts/{filename}.woff2") format("woff2")}}'
+        )
+
+    path = os.path.join(CSS_DIR, 'icons.css')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(faces) + serialize(kept) + '\n')
+    print(f"✓ {os.path.relpath(path, BASE_DIR)}: {len(icons)} icons")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fontawesome-dir',
+                        help='Unpacked Font Awesome 6.4.0 release to subset the icon fonts from')
+    args = parser.parse_args()
+
+    build_critical_css()
+    if args.fontawesome_dir:
+        build_icon_subset(args.fontawesome_dir)
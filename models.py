@@ -1,21 +1,127 @@
+import atexit
+import glob
+import gzip
+import os
+import queue
+import threading
+import re
+import socket
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import wraps
 from pymongo import MongoClient
+from pymongo.errors import BulkWriteError, CollectionInvalid, ConnectionFailure, DuplicateKeyError
+from pymongo.write_concern import WriteConcern
 from datetime import datetime
-from bson import ObjectId
+from bson import ObjectId, json_util
 from config import Config
+from tenants import all_tenants, current_tenant, get_tenant
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process spill lock is available
+    fcntl = None
+
+
+class DatabaseUnavailable(Exception):
+    """Raised instead of contacting MongoDB while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for the MongoDB connection.
+
+    Opens after `threshold` consecutive connection failures so callers fail
+    fast instead of waiting for the server selection timeout. While open, a
+    background thread calls `probe` every `probe_interval` seconds and closes
+    the breaker again as soon as it succeeds.
+    """
+
+    def __init__(self, threshold, probe_interval, probe):
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self.failures = 0
+        self.is_open = False
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise DatabaseUnavailable if the breaker is open"""
+        if self.is_open:
+            raise DatabaseUnavailable('MongoDB is unavailable (circuit breaker open)')
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.is_open or self.failures < self.threshold:
+                return
+            self.is_open = True
+        print(f"✗ MongoDB circuit breaker opened after {self.failures} failures")
+        threading.Thread(target=self._probe_until_closed, daemon=True).start()
+
+    def _probe_until_closed(self):
+        while True:
+            time.sleep(self.probe_interval)
+            try:
+                self.probe()
+            except Exception:
+                continue
+            with self._lock:
+                self.failures = 0
+                self.is_open = False
+            print("✓ MongoDB reachable again, circuit breaker closed")
+            return
+
+
+def ping_database():
+    """Ping MongoDB with a short-lived client"""
+    client = MongoClient(Config.MONGO_URI, serverSelectionTimeoutMS=3000)
+    try:
+        client.admin.command('ping')
+    finally:
+        client.close()
+
 
 class Database:
-    """MongoDB database connection handler"""
+    """
+    MongoDB database connection handler.
+
+    One MongoClient (and connection pool) is shared by every tenant; each
+    tenant gets its own database and optional collection name prefix.
+    """
     
     _client = None
-    _db = None
+    _client_lock = threading.Lock()
+    breaker = CircuitBreaker(
+        threshold=Config.DB_BREAKER_THRESHOLD,
+        probe_interval=Config.DB_BREAKER_PROBE_INTERVAL,
+        probe=ping_database
+    )
+    # Last good result of each guarded read per tenant, served while
+    # MongoDB is down
+    snapshots = {}
     
     @classmethod
-    def get_db(cls):
-        """Get database instance (singleton pattern)"""
-        if cls._db is None:
-            cls._client = MongoClient(Config.MONGO_URI, serverSelectionTimeoutMS=3000)
-            cls._db = cls._client[Config.MONGO_DB_NAME]
-        return cls._db
+    def get_db(cls, tenant=None):
+        """Get the database of `tenant` (default: the current tenant)"""
+        cls.breaker.check()
+        if cls._client is None:
+            with cls._client_lock:
+                if cls._client is None:
+                    cls._client = MongoClient(Config.MONGO_URI, serverSelectionTimeoutMS=3000)
+        tenant = tenant or current_tenant()
+        return cls._client[tenant.db_name]
+
+    @classmethod
+    def collection(cls, name, tenant=None):
+        """Get a collection of `tenant` (default: the current tenant)"""
+        tenant = tenant or current_tenant()
+        return cls.get_db(tenant)[tenant.collection_prefix + name]
     
     @classmethod
     def close(cls):
@@ -23,43 +129,493 @@ class Database:
         if cls._client:
             cls._client.close()
             cls._client = None
-            cls._db = None
+
+    @staticmethod
+    def write_concern():
+        """Write concern built from Config.MONGO_WRITE_CONCERN"""
+        w = Config.MONGO_WRITE_CONCERN
+        return WriteConcern(w=int(w) if w.isdigit() else w)
+
+
+def guarded(f):
+    """Decorator: report connection failures and successes to the breaker."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        try:
+            result = f(*args, **kwargs)
+        except ConnectionFailure:
+            Database.breaker.record_failure()
+            raise
+        Database.breaker.record_success()
+        return result
+    return decorated
+
+
+def with_snapshot(f):
+    """
+    Decorator: remember the last successful result and return it when
+    MongoDB cannot be reached, instead of raising.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = (current_tenant().name, f.__qualname__)
+        try:
+            result = f(*args, **kwargs)
+        except (ConnectionFailure, DatabaseUnavailable):
+            if key in Database.snapshots:
+                return list(Database.snapshots[key])
+            raise
+        Database.snapshots[key] = result
+        return list(result)
+    return decorated
+
+
+@guarded
+def insert_documents(collection, documents):
+    """
+    Insert documents with insert_many, ignoring duplicate key errors so a
+    batch that was partly written before can safely be inserted again.
+    """
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        details = e.details
+        if details.get('writeConcernErrors') or any(
+                err.get('code') != 11000 for err in details.get('writeErrors', [])):
+            raise
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-process buffer that writes documents to a collection in
+    batches from a background thread.
+
+    Batches are flushed when `flush_size` documents are pending or every
+    `interval` seconds. When the buffer is full, `add()` blocks for up to
+    `timeout` seconds. Documents that cannot be written are appended to
+    `spill_path` as NDJSON and replayed on a later flush. The spill file is
+    shared by every worker process and guarded by an OS lock on
+    `spill_path`.lock; lines that cannot be parsed are moved to
+    `spill_path`.rejected.
+    """
+
+    def __init__(self, collection_name, max_size, flush_size, interval, timeout, spill_path):
+        self.collection_name = collection_name
+        self.flush_size = flush_size
+        self.interval = interval
+        self.timeout = timeout
+        self.spill_path = spill_path
+        self._queue = queue.Queue(maxsize=max_size)
+        self._spill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, document, tenant=None):
+        """Queue a document, spilling it to disk if the buffer stays full"""
+        entry = (tenant or current_tenant(), document)
+        try:
+            self._queue.put(entry, timeout=self.timeout)
+        except queue.Full:
+            print("✗ Write buffer full, spilling message to disk")
+            self._spill([entry])
+
+    def flush(self):
+        """Write everything currently buffered"""
+        while True:
+            batch = self._take(self.flush_size)
+            if not batch:
+                break
+            self._write(batch)
+
+    def close(self):
+        """Stop the background thread and flush what is left"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def _take(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self.interval
+            batch = []
+            while len(batch) < self.flush_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+                except queue.Empty:
+                    continue
+            try:
+                if batch:
+                    self._write(batch)
+                elif os.path.exists(self.spill_path) and not Database.breaker.is_open:
+                    self._replay()
+            except Exception as e:
+                # Keep the writer alive; the next pass retries the spill file
+                print(f"✗ Write-behind pass failed ({len(batch)} message(s) affected): {e}")
+
+    def _insert(self, entries):
+        """
+        Insert (tenant, document) entries, one insert_many per tenant.
+        Returns the entries that could not be written.
+        """
+        by_tenant = {}
+        for tenant, document in entries:
+            by_tenant.setdefault(tenant.name, (tenant, []))[1].append(document)
+        failed = []
+        for tenant, documents in by_tenant.values():
+            try:
+                collection = Database.collection(self.collection_name, tenant).with_options(
+                    write_concern=Database.write_concern()
+                )
+                insert_documents(collection, documents)
+            except Exception as e:
+                print(f"✗ Buffered write for {tenant.name} failed: {e}")
+                failed.extend((tenant, document) for document in documents)
+        return failed
+
+    def _write(self, batch):
+        failed = self._insert(batch)
+        if failed:
+            print(f"✗ Spilling {len(failed)} message(s) to disk")
+            self._spill(failed)
+        elif os.path.exists(self.spill_path):
+            self._replay()
+
+    @contextmanager
+    def _locked_spill_file(self):
+        """Hold the spill lock across threads and worker processes"""
+        with self._spill_lock:
+            with open(self.spill_path + '.lock', 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                yield
+
+    def _spill(self, entries):
+        with self._locked_spill_file():
+            self._write_spill_file(entries, 'a')
+
+    def _write_spill_file(self, entries, mode):
+        with open(self.spill_path, mode, encoding='utf-8') as f:
+            for tenant, document in entries:
+                f.write(json_util.dumps({'tenant': tenant.name, 'document': document}) + '\n')
+
+    def _reject_lines(self, lines, reason):
+        with open(self.spill_path + '.rejected', 'a', encoding='utf-8') as f:
+            for line in lines:
+                f.write(line if line.endswith('\n') else line + '\n')
+        print(f"✗ Moved {len(lines)} spilled line(s) to {self.spill_path}.rejected: {reason}")
+
+    def _replay(self):
+        """Insert spilled documents, keeping only those that still fail"""
+        with self._locked_spill_file():
+            if not os.path.exists(self.spill_path):
+                return
+            with open(self.spill_path, encoding='utf-8') as f:
+                lines = [line for line in f if line.strip()]
+            entries = []
+            rejected = []
+            unknown = []
+            for line in lines:
+                try:
+                    data = json_util.loads(line)
+                    tenant = get_tenant(data['tenant'])
+                    document = data['document']
+                except Exception:
+                    rejected.append(line)
+                    continue
+                if tenant is None:
+                    # Never write into another site's database
+                    unknown.append(line)
+                else:
+                    entries.append((tenant, document))
+            if rejected:
+                self._reject_lines(rejected, 'unreadable')
+            if unknown:
+                self._reject_lines(unknown, 'tenant not served by this process')
+            failed = self._insert(entries)
+            if failed:
+                self._write_spill_file(failed, 'w')
+                return
+            os.remove(self.spill_path)
+            if entries:
+                print(f"✓ Replayed {len(entries)} spilled message(s)")
+
+
+class MessageArchiver:
+    """
+    Moves read messages older than `retention_days` out of the hot collection.
+
+    Messages are archived in batches of `batch_size` by a background pass that
+    runs every `interval` seconds. The archive is either a MongoDB collection
+    created with zlib block compression (`archive_collection`) in each
+    tenant's database or, when `archive_dir` is set, gzipped NDJSON files
+    with one directory per tenant and one file per month.
+
+    Every worker process runs an archiver, so a tenant is only archived by
+    the process holding its lease document in the `locks` collection.
+    """
+
+    lock_collection = 'locks'
+    lease_seconds = 600
+
+    def __init__(self, collection_name, retention_days, batch_size, interval,
+                 archive_collection, archive_dir=None):
+        self.collection_name = collection_name
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.archive_collection = archive_collection
+        self.archive_dir = archive_dir
+        self._archive_ready = set()
+        self._owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}'
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background archiving passes"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.register(self._stop.set)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                archived = self.run_pass()
+                if archived:
+                    print(f"✓ Archived {archived} contact message(s)")
+            except Exception as e:
+                print(f"✗ Archiving pass failed: {e}")
+            self._stop.wait(self.interval)
+
+    def run_pass(self):
+        """Archive every eligible message of every tenant"""
+        archived = 0
+        for tenant in all_tenants():
+            try:
+                archived += self._archive_tenant(tenant)
+            except Exception as e:
+                print(f"✗ Archiving for {tenant.name} failed: {e}")
+        return archived
+
+    def _lease_id(self):
+        return f'{self.collection_name}_archiver'
+
+    def _acquire_lease(self, tenant):
+        """Take or renew this tenant's archiving lease; False if another process holds it"""
+        now = datetime.utcnow()
+        try:
+            Database.collection(self.lock_collection, tenant).find_one_and_update(
+                {
+                    '_id': self._lease_id(),
+                    '$or': [{'owner': self._owner}, {'expires_at': {'$lt': now}}]
+                },
+                {'$set': {
+                    'owner': self._owner,
+                    'expires_at': now + timedelta(seconds=self.lease_seconds)
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def _release_lease(self, tenant):
+        Database.collection(self.lock_collection, tenant).delete_one(
+            {'_id': self._lease_id(), 'owner': self._owner}
+        )
+
+    @guarded
+    def _archive_tenant(self, tenant):
+        """Archive one tenant's eligible messages, one batch at a time"""
+        if not self._acquire_lease(tenant):
+            return 0
+        try:
+            return self._archive_batches(tenant)
+        finally:
+            self._release_lease(tenant)
+
+    def _archive_batches(self, tenant):
+        collection = Database.collection(self.collection_name, tenant)
+        collection.create_index([('read', 1), ('created_at', 1)])
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        archived = 0
+        # Renew the lease before each batch and stop if it was lost
+        while not self._stop.is_set() and self._acquire_lease(tenant):
+            batch = list(
+                collection.find({'read': True, 'created_at': {'$lt': cutoff}})
+                .sort('created_at', 1)
+                .limit(self.batch_size)
+            )
+            if not batch:
+                break
+            if self.archive_dir:
+                self._write_files(tenant, batch)
+            else:
+                insert_documents(self._get_archive_collection(tenant), batch)
+            collection.delete_many({'_id': {'$in': [doc['_id'] for doc in batch]}})
+            archived += len(batch)
+        return archived
+
+    def _get_archive_collection(self, tenant):
+        db = Database.get_db(tenant)
+        name = tenant.collection_prefix + self.archive_collection
+        if tenant.name not in self._archive_ready:
+            try:
+                db.create_collection(
+                    name,
+                    storageEngine={'wiredTiger': {'configString': 'block_compressor=zlib'}}
+                )
+            except CollectionInvalid:
+                pass  # Already exists
+            db[name].create_index([('created_at', -1)])
+            self._archive_ready.add(tenant.name)
+        return db[name]
+
+    def _tenant_dir(self, tenant):
+        return os.path.join(self.archive_dir, tenant.name)
+
+    def _write_files(self, tenant, documents):
+        directory = self._tenant_dir(tenant)
+        os.makedirs(directory, exist_ok=True)
+        by_month = {}
+        for document in documents:
+            by_month.setdefault(document['created_at'].strftime('%Y-%m'), []).append(document)
+        for month, month_docs in by_month.items():
+            path = os.path.join(directory, f'{self.collection_name}-{month}.ndjson.gz')
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for document in month_docs:
+                    f.write(json_util.dumps(document) + '\n')
+
+    def search(self, query, limit=50, tenant=None):
+        """Archived messages whose name, email or message contain `query`"""
+        tenant = tenant or current_tenant()
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        if not self.archive_dir:
+            regex = {'$regex': pattern.pattern, '$options': 'i'}
+            return list(
+                Database.collection(self.archive_collection, tenant)
+                .find({'$or': [{'name': regex}, {'email': regex}, {'message': regex}]})
+                .sort('created_at', -1)
+                .limit(limit)
+            )
+
+        # Keyed by _id: a batch is written again if its delete_many failed
+        results = {}
+        paths = glob.glob(os.path.join(self._tenant_dir(tenant), f'{self.collection_name}-*.ndjson.gz'))
+        for path in sorted(paths, reverse=True):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    document = json_util.loads(line)
+                    if any(pattern.search(document.get(field) or '') for field in ('name', 'email', 'message')):
+                        results[document['_id']] = document
+        documents = sorted(results.values(), key=lambda doc: doc['created_at'], reverse=True)
+        return documents[:limit]
 
 
 class ContactMessage:
     """Contact form message model"""
     
     collection_name = 'resume'
+    _buffer = None
+    _buffer_lock = threading.Lock()
+    _archiver = None
+
+    @staticmethod
+    def get_buffer():
+        """Get the write-behind buffer, starting it on first use"""
+        with ContactMessage._buffer_lock:
+            if ContactMessage._buffer is None:
+                ContactMessage._buffer = WriteBehindBuffer(
+                    ContactMessage.collection_name,
+                    max_size=Config.CONTACT_BUFFER_SIZE,
+                    flush_size=Config.CONTACT_FLUSH_SIZE,
+                    interval=Config.CONTACT_FLUSH_INTERVAL,
+                    timeout=Config.CONTACT_BUFFER_TIMEOUT,
+                    spill_path=Config.CONTACT_SPILL_FILE
+                )
+            return ContactMessage._buffer
+
+    @staticmethod
+    def get_archiver():
+        """Get the archiver configured by the CONTACT_RETENTION_* settings"""
+        if ContactMessage._archiver is None:
+            ContactMessage._archiver = MessageArchiver(
+                ContactMessage.collection_name,
+                retention_days=Config.CONTACT_RETENTION_DAYS,
+                batch_size=Config.CONTACT_ARCHIVE_BATCH_SIZE,
+                interval=Config.CONTACT_ARCHIVE_INTERVAL,
+                archive_collection=Config.CONTACT_ARCHIVE_COLLECTION,
+                archive_dir=Config.CONTACT_ARCHIVE_DIR
+            )
+        return ContactMessage._archiver
+
+    @staticmethod
+    @guarded
+    def search_archive(query):
+        """Search archived messages by name, email or message text"""
+        return ContactMessage.get_archiver().search(query)
     
     @staticmethod
     def create(name, email, message):
-        db = Database.get_db()
-        collection = db[ContactMessage.collection_name]
+        """
+        Store a contact message. With CONTACT_WRITE_BEHIND enabled the
+        message is queued and written in the background.
+        """
         document = {
+            '_id': ObjectId(),
             'name': name,
             'email': email,
             'message': message,
             'created_at': datetime.utcnow(),
             'read': False
         }
-        result = collection.insert_one(document)
-        document['_id'] = result.inserted_id
+        if Config.CONTACT_WRITE_BEHIND:
+            # Not reported to the circuit breaker: nothing touches MongoDB here
+            ContactMessage.get_buffer().add(document)
+            return document
+
+        ContactMessage._insert(document)
         return document
+
+    @staticmethod
+    @guarded
+    def _insert(document):
+        """Insert one message directly with the configured write concern"""
+        collection = Database.collection(ContactMessage.collection_name).with_options(
+            write_concern=Database.write_concern()
+        )
+        collection.insert_one(document)
     
     @staticmethod
+    @with_snapshot
+    @guarded
     def get_all():
         """Get all contact messages"""
-        db = Database.get_db()
-        collection = db[ContactMessage.collection_name]
+        collection = Database.collection(ContactMessage.collection_name)
         return list(collection.find().sort('created_at', -1))
     
     @staticmethod
+    @guarded
     def mark_as_read(message_id):
         """Mark a message as read"""
-        db = Database.get_db()
-        collection = db[ContactMessage.collection_name]
+        collection = Database.collection(ContactMessage.collection_name)
         collection.update_one(
-            {'_id': message_id},
+            {'_id': ObjectId(message_id)},
             {'$set': {'read': True}}
         )
 
@@ -70,6 +626,7 @@ class Skill:
     collection_name = 'skills'
     
     @staticmethod
+    @guarded
     def create(name, category, proficiency):
         """
         Create a new skill entry.
@@ -79,8 +636,7 @@ class Skill:
             category (str): Category label (e.g. 'Web Development')
             proficiency (int): Proficiency percentage 0-100
         """
-        db = Database.get_db()
-        collection = db[Skill.collection_name]
+        collection = Database.collection(Skill.collection_name)
         document = {
             'name': name,
             'category': category,
@@ -92,24 +648,25 @@ class Skill:
         return document
     
     @staticmethod
+    @with_snapshot
+    @guarded
     def get_all():
         """Get all skills sorted by category then name"""
-        db = Database.get_db()
-        collection = db[Skill.collection_name]
+        collection = Database.collection(Skill.collection_name)
         return list(collection.find().sort([('category', 1), ('name', 1)]))
     
     @staticmethod
+    @guarded
     def get_by_id(skill_id):
         """Get a skill by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Skill.collection_name]
+        collection = Database.collection(Skill.collection_name)
         return collection.find_one({'_id': ObjectId(skill_id)})
 
     @staticmethod
+    @guarded
     def update(skill_id, name, category, proficiency):
         """Update a skill by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Skill.collection_name]
+        collection = Database.collection(Skill.collection_name)
         collection.update_one(
             {'_id': ObjectId(skill_id)},
             {
@@ -122,10 +679,10 @@ class Skill:
         )
 
     @staticmethod
+    @guarded
     def delete(skill_id):
         """Delete a skill by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Skill.collection_name]
+        collection = Database.collection(Skill.collection_name)
         collection.delete_one({'_id': ObjectId(skill_id)})
 
 
@@ -135,6 +692,7 @@ class Certificate:
     collection_name = 'certificates'
     
     @staticmethod
+    @guarded
     def create(title, issuer, issue_date, credential_url, description):
         """
         Create a new certificate entry.
@@ -146,8 +704,7 @@ class Certificate:
             credential_url (str): URL to verify the credential (optional)
             description (str): Short description (optional)
         """
-        db = Database.get_db()
-        collection = db[Certificate.collection_name]
+        collection = Database.collection(Certificate.collection_name)
         document = {
             'title': title,
             'issuer': issuer,
@@ -161,24 +718,25 @@ class Certificate:
         return document
     
     @staticmethod
+    @with_snapshot
+    @guarded
     def get_all():
         """Get all certificates sorted newest first"""
-        db = Database.get_db()
-        collection = db[Certificate.collection_name]
+        collection = Database.collection(Certificate.collection_name)
         return list(collection.find().sort('created_at', -1))
     
     @staticmethod
+    @guarded
     def get_by_id(cert_id):
         """Get a certificate by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Certificate.collection_name]
+        collection = Database.collection(Certificate.collection_name)
         return collection.find_one({'_id': ObjectId(cert_id)})
 
     @staticmethod
+    @guarded
     def update(cert_id, title, issuer, issue_date, credential_url, description):
         """Update a certificate by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Certificate.collection_name]
+        collection = Database.collection(Certificate.collection_name)
         collection.update_one(
             {'_id': ObjectId(cert_id)},
             {
@@ -193,10 +751,10 @@ class Certificate:
         )
 
     @staticmethod
+    @guarded
     def delete(cert_id):
         """Delete a certificate by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Certificate.collection_name]
+        collection = Database.collection(Certificate.collection_name)
         collection.delete_one({'_id': ObjectId(cert_id)})
 
 
@@ -206,9 +764,9 @@ class Project:
     collection_name = 'projects'
 
     @staticmethod
+    @guarded
     def create(title, description, tags, github_url, live_url, icon):
-        db = Database.get_db()
-        collection = db[Project.collection_name]
+        collection = Database.collection(Project.collection_name)
         document = {
             'title': title,
             'description': description,
@@ -223,24 +781,25 @@ class Project:
         return document
 
     @staticmethod
+    @with_snapshot
+    @guarded
     def get_all():
         """Get all projects sorted newest first"""
-        db = Database.get_db()
-        collection = db[Project.collection_name]
+        collection = Database.collection(Project.collection_name)
         return list(collection.find().sort('created_at', -1))
 
     @staticmethod
+    @guarded
     def get_by_id(project_id):
         """Get a project by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Project.collection_name]
+        collection = Database.collection(Project.collection_name)
         return collection.find_one({'_id': ObjectId(project_id)})
 
     @staticmethod
+    @guarded
     def update(project_id, title, description, tags, github_url, live_url, icon):
         """Update a project by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Project.collection_name]
+        collection = Database.collection(Project.collection_name)
         collection.update_one(
             {'_id': ObjectId(project_id)},
             {
@@ -256,9 +815,9 @@ class Project:
         )
 
     @staticmethod
+    @guarded
     def delete(project_id):
         """Delete a project by its ObjectId string"""
-        db = Database.get_db()
-        collection = db[Project.collection_name]
+        collection = Database.collection(Project.collection_name)
         collection.delete_one({'_id': ObjectId(project_id)})
 
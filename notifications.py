@@ -0,0 +1,117 @@
+import atexit
+import threading
+from datetime import datetime
+from flask_mail import Connection, Message
+from tenants import current_tenant
+
+
+class ContactNotifier:
+    """
+    Contact form email notifications.
+
+    In 'immediate' mode every submission is mailed straight away. In 'digest'
+    mode submissions received within MAIL_DIGEST_WINDOW seconds are grouped
+    into a single email per tenant, sent over one SMTP session. Mail
+    settings and the recipient come from the tenant the submission was for.
+    """
+
+    def __init__(self, app, mail):
+        self.app = app
+        self.mail = mail
+        self.mode = app.config['MAIL_DIGEST_MODE']
+        self.window = app.config['MAIL_DIGEST_WINDOW']
+
+        # Compile the templates once up front instead of on every send
+        env = app.jinja_env
+        self.contact_text = env.get_template('email/contact.txt')
+        self.contact_html = env.get_template('email/contact.html')
+        self.digest_text = env.get_template('email/digest.txt')
+        self.digest_html = env.get_template('email/digest.html')
+
+        self._mail_states = {}
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def notify(self, name, email, message):
+        """
+        Send (or queue, in digest mode) a notification for one submission.
+        Returns True if the email was sent or queued, False otherwise.
+        """
+        entry = {
+            'name': name,
+            'email': email,
+            'message': message,
+            'submitted_at': datetime.now()
+        }
+        tenant = current_tenant()
+        if self.mode != 'digest':
+            return self._send(tenant, [entry])
+
+        with self._lock:
+            self._pending.setdefault(tenant.name, (tenant, []))[1].append(entry)
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return True
+
+    def flush(self):
+        """Send the queued submissions as one digest email per tenant"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        sent = True
+        for tenant, entries in pending.values():
+            sent = self._send(tenant, entries) and sent
+        return sent
+
+    def _mail_state(self, tenant):
+        """Flask-Mail settings for a tenant, built once per tenant"""
+        if tenant.name not in self._mail_states:
+            config = dict(self.app.config)
+            config.update({
+                key: tenant.get(key) for key in (
+                    'MAIL_SERVER', 'MAIL_PORT', 'MAIL_USE_TLS', 'MAIL_USERNAME',
+                    'MAIL_PASSWORD', 'MAIL_DEFAULT_SENDER'
+                )
+            })
+            self._mail_states[tenant.name] = self.mail.init_mail(
+                config, self.app.debug, self.app.testing
+            )
+        return self._mail_states[tenant.name]
+
+    def _build_message(self, tenant, entries):
+        if len(entries) == 1:
+            entry = entries[0]
+            msg = Message(
+                subject=f"New Contact Form Submission from {entry['name']}",
+                sender=tenant.get('MAIL_DEFAULT_SENDER'),
+                recipients=[tenant.get('RECIPIENT_EMAIL')],
+                reply_to=entry['email']
+            )
+            msg.body = self.contact_text.render(entry=entry)
+            msg.html = self.contact_html.render(entry=entry)
+        else:
+            msg = Message(
+                subject=f'{len(entries)} New Contact Form Submissions',
+                sender=tenant.get('MAIL_DEFAULT_SENDER'),
+                recipients=[tenant.get('RECIPIENT_EMAIL')]
+            )
+            msg.body = self.digest_text.render(entries=entries)
+            msg.html = self.digest_html.render(entries=entries)
+        return msg
+
+    def _send(self, tenant, entries):
+        try:
+            with self.app.app_context():
+                msg = self._build_message(tenant, entries)
+                with Connection(self._mail_state(tenant)) as conn:
+                    conn.send(msg)
+            return True
+        except Exception as e:
+            print(f"Error sending email: {e}")
+            return False
@@ -0,0 +1,118 @@
+import json
+from contextvars import ContextVar
+from config import Config
+
+
+def normalize_host(host):
+    """Lower-cased host name without the port"""
+    return host.split(':', 1)[0].lower()
+
+
+class Tenant:
+    """
+    One portfolio site served by this process.
+
+    Settings not given for the tenant fall back to the matching Config
+    attribute, so a tenant only lists what differs (MONGO_DB_NAME,
+    COLLECTION_PREFIX, RECIPIENT_EMAIL, MAIL_*, ADMIN_PASSWORD...). A tenant
+    with its own MAIL_USERNAME sends from that address unless it also sets
+    MAIL_DEFAULT_SENDER.
+    """
+
+    def __init__(self, name, hosts=(), settings=None):
+        self.name = name
+        self.hosts = [normalize_host(host) for host in hosts]
+        self.settings = settings or {}
+
+    def get(self, key):
+        if key == 'MAIL_DEFAULT_SENDER' and key not in self.settings and 'MAIL_USERNAME' in self.settings:
+            return self.settings['MAIL_USERNAME']
+        return self.settings.get(key, getattr(Config, key))
+
+    @property
+    def db_name(self):
+        return self.get('MONGO_DB_NAME')
+
+    @property
+    def collection_prefix(self):
+        return self.get('COLLECTION_PREFIX')
+
+
+def load_tenants(path):
+    """
+    Load tenants from a JSON file of the form
+    {"name": {"hosts": ["example.com"], "MONGO_DB_NAME": "...", ...}}
+
+    Raises ValueError for a tenant that would share the single-site admin
+    password, recipient or data, and for tenants that share a host or a
+    database + collection prefix.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    tenants = {}
+    hosts_seen = {}
+    storage_seen = {}
+    for name, settings in data.items():
+        settings = dict(settings)
+        hosts = settings.pop('hosts', [])
+        missing = [key for key in ('ADMIN_PASSWORD', 'RECIPIENT_EMAIL') if not settings.get(key)]
+        if not settings.get('MONGO_DB_NAME') and not settings.get('COLLECTION_PREFIX'):
+            missing.append('MONGO_DB_NAME or COLLECTION_PREFIX')
+        if missing:
+            raise ValueError(f"Tenant '{name}' in {path} must set {', '.join(missing)}")
+
+        tenant = Tenant(name, hosts, settings)
+        for host in tenant.hosts:
+            if host in hosts_seen:
+                raise ValueError(f"Tenants '{hosts_seen[host]}' and '{name}' share the host '{host}'")
+            hosts_seen[host] = name
+        storage = (tenant.db_name, tenant.collection_prefix)
+        if storage in storage_seen:
+            raise ValueError(
+                f"Tenants '{storage_seen[storage]}' and '{name}' share the database "
+                f"'{storage[0]}' with collection prefix '{storage[1]}'"
+            )
+        storage_seen[storage] = name
+        tenants[name] = tenant
+    return tenants
+
+
+DEFAULT_TENANT = Tenant('default')
+TENANTS = load_tenants(Config.TENANTS_FILE) if Config.TENANTS_FILE else {}
+_tenants_by_host = {host: t for t in TENANTS.values() for host in t.hosts}
+_current_tenant = ContextVar('current_tenant', default=DEFAULT_TENANT)
+
+
+def all_tenants():
+    """Every tenant served by this process"""
+    return list(TENANTS.values()) or [DEFAULT_TENANT]
+
+
+def get_tenant(name):
+    """Tenant by name, or None if this process does not serve it"""
+    if not TENANTS:
+        return DEFAULT_TENANT if name == DEFAULT_TENANT.name else None
+    return TENANTS.get(name)
+
+
+def resolve_tenant(host):
+    """
+    Tenant for a request Host header. Without TENANTS_FILE every host maps to
+    the default tenant; with it, unknown hosts resolve to None.
+    """
+    if not TENANTS:
+        return DEFAULT_TENANT
+    return _tenants_by_host.get(normalize_host(host))
+
+
+def current_tenant():
+    """Tenant of the request being handled (default tenant outside requests)"""
+    return _current_tenant.get()
+
+
+def set_current_tenant(tenant):
+    return _current_tenant.set(tenant)
+
+
+def reset_current_tenant(token):
+    _current_tenant.reset(token)